@@ -0,0 +1,65 @@
+#aggregates shared by the dashboard and the offline scripts
+import os
+
+import pandas as pd
+
+# Every dataset the dashboard reads, by name
+DATASETS = {
+    'demographics': 'Input files/demographics.csv',
+    'proficiency': 'Input files/proficiency.csv',
+    'percentage_pie': 'Input files/percentage_pie.csv',
+    'proficiency_pie': 'Input files/proficiency_pie.csv',
+    'uconst': 'Input files/uconst.csv',
+    'dconst': 'Input files/dconst.csv',
+    'chal': 'Input files/chal.csv',
+    'potential': 'Input files/potential.csv',
+    'workchallenge': 'Input files/workchallenge.csv',
+    'optimism': 'Input files/optimism.csv',
+    'opportunities': 'Input files/opportunities.csv',
+    'map': 'Input files/map.gpkg',
+}
+
+# Datasets that are only read when the file is there: the respondent-level
+# proficiency answers come from the survey export (see proficiency_stats)
+OPTIONAL_DATASETS = {
+    'proficiency_responses': 'Input files/proficiency_responses.csv',
+}
+
+# Datasets with one row per respondent. They are not offered for download on the
+# dashboard, only their aggregates are
+RESPONDENT_DATASETS = ('demographics', 'proficiency_responses')
+
+# Demographic questions, one respondent per row of demographics
+DEMOGRAPHIC_COLUMNS = ('sc_gender', 'sc_region', 'sc_country', 'sc_primary_role', 'sc_organization')
+
+
+def load_datasets():
+    """Read every dataset without streamlit, for the offline scripts."""
+    data = {}
+    optional = {name: filename for name, filename in OPTIONAL_DATASETS.items() if os.path.exists(filename)}
+    for name, filename in {**DATASETS, **optional}.items():
+        if filename.endswith('.gpkg'):
+            import geopandas as gpd
+            data[name] = gpd.read_file(filename)
+        else:
+            data[name] = pd.read_csv(filename)
+    return data
+
+
+def gender_summary(demographics):
+    # Filter the DataFrame by gender values of 1 and 0
+    filtered_df = demographics[demographics['sc_gender'].isin(['Male', 'Female'])]
+
+    # Calculate the percentage of each gender value per year
+    df_summary = filtered_df.groupby(['year', 'sc_gender']).size().reset_index(name='count')
+    df_summary['percentage'] = df_summary.groupby('year')['count'].transform(lambda x: x / x.sum() * 100).round(1)
+    df_summary['percentage2'] = df_summary['percentage'].astype(str) + '%'
+    return df_summary
+
+
+def crosstab_by_year(demographics, column):
+    """Number of respondents per answer to a demographic question (rows) and survey year (columns)."""
+    table = pd.crosstab(demographics[column], demographics['year'])
+    table.columns = table.columns.astype(str)
+    table.columns.name = None
+    return table.reset_index()
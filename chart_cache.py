@@ -0,0 +1,95 @@
+#on-disk cache of rendered charts, keyed by their fingerprint
+#
+#matplotlib charts are stored as the png st.pyplot would send, plotly charts as
+#their figure json or as the compact spec the dashboard sends. Entries never go
+#stale: a change to a chart's data or code changes its fingerprint, so the cache
+#can be kept across deploys and only the charts that actually changed get drawn
+#again. Files of old fingerprints are never deleted.
+import functools
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+import matplotlib.pyplot as plt
+import plotly.io as pio
+import plotly.utils
+
+import settings
+from fingerprint import chart_fingerprint, code_fingerprint
+from plotly_compact import SHARED_TEMPLATE, compact_spec
+
+# Same options st.pyplot uses to save a figure
+PNG_OPTIONS = {'bbox_inches': 'tight', 'dpi': 200, 'format': 'png'}
+
+
+def _path(name, fingerprint, extension):
+    return os.path.join(settings.CHART_CACHE_DIR, f'{name}-{fingerprint[:20]}.{extension}')
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path, content):
+    # write to a temporary file first so concurrent sessions never read half a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def png(name, function, *args, dpi=PNG_OPTIONS['dpi']):
+    """PNG bytes of a matplotlib chart, drawn only if it is not cached yet."""
+    # the file depends on every option it is saved with, not just the chart
+    options = {**PNG_OPTIONS, 'dpi': dpi}
+    key = f'{chart_fingerprint(function, *args)}\n{json.dumps(options, sort_keys=True)}'
+    fingerprint = hashlib.sha256(key.encode()).hexdigest()
+    path = _path(name, fingerprint, 'png')
+    content = _read(path)
+    if content is None:
+        fig = function(*args)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **options)
+        plt.close(fig)
+        content = buffer.getvalue()
+        _write(path, content)
+    return content
+
+
+@functools.lru_cache(maxsize=None)
+def _template_fingerprint():
+    # the template's content, not its code: it is built on streamlit's template,
+    # which can change with the streamlit version
+    template = pio.templates[SHARED_TEMPLATE].to_plotly_json()
+    return hashlib.sha256(json.dumps(template, sort_keys=True, cls=plotly.utils.PlotlyJSONEncoder).encode()).hexdigest()
+
+
+def plotly_spec(name, function, *args, compact=False, typed_arrays=False):
+    """Figure json of a plotly chart as a dict, built only if it is not cached yet.
+
+    With compact, the spec compact_spec() makes of it is cached instead, so a
+    rerun only reads the file.
+    """
+    # the shared template is part of every plotly chart's output, and the compact
+    # spec also depends on the code that compacts it and on its options
+    key = chart_fingerprint(function, *args) + _template_fingerprint()
+    if compact:
+        key += f'\n{code_fingerprint(compact_spec)}\ntyped_arrays={typed_arrays}'
+    fingerprint = hashlib.sha256(key.encode()).hexdigest()
+    path = _path(name, fingerprint, 'json')
+    content = _read(path)
+    if content is None:
+        fig = function(*args)
+        if compact:
+            content = json.dumps(compact_spec(fig, typed_arrays=typed_arrays)).encode('utf-8')
+        else:
+            content = pio.to_json(fig, validate=False).encode('utf-8')
+        _write(path, content)
+    return json.loads(content)
@@ -0,0 +1,485 @@
+#every chart drawn by the dashboard, as functions of the data they show
+#
+#dashboard.py only lays out text and calls these; keeping them free of
+#streamlit lets snapshots.py render them headlessly and fingerprint.py hash
+#them
+import re
+import textwrap
+
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+import numpy as np
+import pandas as pd
+from matplotlib.colors import LinearSegmentedColormap
+import plotly.express as px
+from plotly.subplots import make_subplots
+
+import settings
+from aggregates import gender_summary
+from plotly_compact import SHARED_TEMPLATE, RANKED_BAR_MOVEMENT_HOVER, PIE_HOVER
+from proficiency_stats import SHARE_COLUMNS, summarize
+from trends import rank_trends
+if settings.CHART_BACKEND == 'plotnine':
+    from plotnine_charts import gender_chart, proficiency_chart
+else:
+    from mpl_charts import gender_chart, proficiency_chart
+
+
+############################################################
+### Map plot
+############################################################
+
+# Define the custom colors for each region
+MAP_COLORS = {
+    '2020': '#68BDE4',
+    '2021': '#0E87BE',
+    '2022': '#04425F',
+    'Other': 'lightgray'
+}
+
+
+def map_chart(map):
+    # Plot the world map with colored countries based on the region
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plt.rcParams['font.family'] = 'sans serif'
+    map.plot(column='sc_count_novel', linewidth=0.4, ax=ax, edgecolor='0.8', legend=True, color=[MAP_COLORS.get(region, 'lightgrey') for region in map['sc_count_novel']])
+
+    # Add the first legend for the color mapping
+    legend_colors = [mpatches.Patch(color=MAP_COLORS[region], label=region) for region in MAP_COLORS]
+    ax.legend(handles=legend_colors, title='First app.')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.tick_params(axis='both', which='both', length=0)
+
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    # Set plot title
+    ax.set_title('Expansion of countries from 2020 to 2022', fontsize=12, weight='bold')
+    return fig
+
+
+############################################################
+### Org and role plots
+############################################################
+
+ORGANIZATIONS = ['Conservation NGO', 'University/Research Inst.', 'Tech company',
+                 'Private (non-tech)', 'Government agency', 'Other']
+ROLES = ['Conservation practitioner', 'Academic or researcher', 'Technologist', 'Investor or funder', 'Policymaker']
+
+
+def _counts_per_year(demographics, column, values):
+    years = demographics['year'].unique()
+
+    # Create an empty DataFrame to store the counts
+    counts_per_year = pd.DataFrame(index=demographics[column].unique(), columns=years)
+
+    # Calculate the counts of unique values in the column for each year
+    for year in years:
+        year_df = demographics[demographics['year'] == year]
+        counts_per_year[year] = year_df[column].value_counts()
+
+    # Replace NaN values with 0
+    return counts_per_year.loc[values].fillna(0)
+
+
+def _bubble_chart(counts_per_year, colors, title, tight_before_title):
+    years = counts_per_year.columns
+
+    # Set the figure size
+    fig, ax = plt.subplots(figsize=(12, 6))
+    plt.rcParams['font.family'] = 'sans serif'
+
+    # Plot the circles for each year
+    x_coords = range(len(years))
+    for i, year in enumerate(years):
+        counts = counts_per_year[year]
+        labels = counts.index
+        sizes = counts.values
+
+        if not labels.empty:
+            plt.scatter([i] * len(labels), labels, s=sizes * 350, alpha=0.7, color=colors[i])
+
+            # Add text inside each circle
+            for label, size in zip(labels, sizes):
+                plt.text(i, label, str(int(size)), ha='center', va='center', color='white', weight='bold', fontsize=14)
+
+    # Set x-axis tick labels as year values
+    plt.xticks(x_coords, years, fontsize=14)
+    ax.margins(x=0.1)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.tick_params(axis='both', which='both', length=0)
+
+    # Set y-axis tick labels
+    plt.yticks(fontsize=14)
+
+    # Adjust the figure layout to prevent label cutoff, and set the plot title
+    if tight_before_title:
+        plt.tight_layout()
+    plt.title(title, fontsize=18, weight='bold')
+    if not tight_before_title:
+        plt.tight_layout()
+    return fig
+
+
+def organization_chart(demographics):
+    demographics = demographics.assign(sc_organization=demographics['sc_organization'].fillna(0))
+    org_counts = _counts_per_year(demographics, 'sc_organization', ORGANIZATIONS)
+    return _bubble_chart(org_counts, ['#DD7E3B', '#EC7825', '#D22A00'],
+                         'Organization of respondents by year (count)\n', tight_before_title=False)
+
+
+def role_chart(demographics):
+    role_counts = _counts_per_year(demographics, 'sc_primary_role', ROLES)
+    return _bubble_chart(role_counts, ['#4CAF50', 'green', 'darkgreen'],
+                         'Primary role of respondents by year (count)\n', tight_before_title=True)
+
+
+############################################################
+### Proficiency yearly pie charts
+############################################################
+
+USAGE_COLORS = {
+    'Respondents using technology' : '#0C4E6F',
+    'Respondents not using technology' : '#13C2FF'
+}
+PROFICIENCY_COLORS = {
+    'Highly proficient respondents' : '#BD6A31',
+    'Respondents with average or low proficiency' : '#FF9845'
+}
+
+
+def _yearly_pies(data, choice, values, names, color_map, title):
+    filtered_data = data[data['technology'] == choice]
+
+    # Filter data for the years of interest
+    year_2020_data = filtered_data[filtered_data['year'] == 2020]
+    max_year_data = filtered_data[filtered_data['year'] == filtered_data['year'].max()]
+
+    # Create a subplot layout and add a pie chart for each year
+    fig = make_subplots(rows=1, cols=2, specs=[[{'type': 'pie'}, {'type': 'pie'}]])
+    fig.update_layout(template=SHARED_TEMPLATE)
+    for col, year_data in enumerate([year_2020_data, max_year_data], start=1):
+        pie = px.pie(
+            year_data,
+            values=values,
+            names=names,
+            color=names,
+            color_discrete_map=color_map,
+            hole=0.6
+        )
+        fig.add_trace(pie.data[0], row=1, col=col)
+
+    # Customize layout and annotations
+    fig.update_traces(hovertemplate=PIE_HOVER,
+                    showlegend=False,
+                    sort=False)
+
+    fig.update_layout(
+        title_text=title,
+        title_font=dict(size=16)
+    )
+
+    # Add year annotations
+    fig.add_annotation(x=0.00001, y=0.9999, text="2020", font=dict(size=18), showarrow=False)
+    fig.add_annotation(x=0.99999, y=0.9999, text=f"{filtered_data['year'].max()}", font=dict(size=18), showarrow=False)
+    return fig
+
+
+def usage_pies(percentage_pie, choice):
+    return _yearly_pies(percentage_pie, choice, 'percentage_values', 'percentage_type', USAGE_COLORS,
+                        f'<b>Share of users, {choice} (%)</b>')
+
+
+def proficiency_pies(proficiency_pie, choice):
+    return _yearly_pies(proficiency_pie, choice, 'prof_values', 'proficiency', PROFICIENCY_COLORS,
+                        f'<b>Share of highly proficient users, {choice} (%)</b>')
+
+
+############################################################
+### Proficiency levels
+############################################################
+
+# From novice (1) to expert (5), ending on the colour of the highly proficient pie slice
+PROFICIENCY_LEVEL_COLORS = {'1': '#FFE3CC', '2': '#FFC08F', '3': '#FF9845', '4': '#D9773A', '5': '#BD6A31'}
+PROFICIENCY_LEVEL_HOVER = ("<b>%{y}, level %{fullData.name}</b> <br>" +
+                           "Share: %{x:.1f}% <br>" +
+                           "Median: %{customdata[0]:.1f}, mean: %{customdata[1]:.2f} <br>" +
+                           "Respondents: %{customdata[2]} <br>" +
+                           "<extra></extra>")
+
+
+def proficiency_levels_chart(summary, choice):
+    """Share of users at every proficiency level, one bar per survey year (summary from proficiency_stats)."""
+    data = summary[summary['technology'] == choice]
+    data = data.assign(year=data['year'].astype(str))
+    levels = data.melt(id_vars=['year', 'median', 'mean', 'respondents'], value_vars=SHARE_COLUMNS,
+                       var_name='level', value_name='share')
+    levels = levels.assign(level=levels['level'].str.removeprefix('share_'), share=levels['share'] * 100)
+
+    fig = px.bar(levels,
+                 x='share',
+                 y='year',
+                 color='level',
+                 orientation='h',
+                 category_orders={'year': sorted(data['year'], reverse=True), 'level': list(PROFICIENCY_LEVEL_COLORS)},
+                 color_discrete_map=PROFICIENCY_LEVEL_COLORS,
+                 custom_data=['median', 'mean', 'respondents'],
+                 template=SHARED_TEMPLATE
+                 )
+    fig.update_traces(hovertemplate=PROFICIENCY_LEVEL_HOVER)
+    fig.update_layout(
+        title=f'<b>Proficiency of {choice} users, from novice (1) to expert (5)</b>',
+        title_font=dict(size=16),
+        legend_title_text='Level',
+        xaxis_title='',
+        yaxis_title='',
+        xaxis=dict(
+            tickvals=list(range(0, 101, 20)),
+            ticktext=[f"{i}%" for i in range(0, 101, 20)],
+            range=[0, 100]),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="right", x=1)
+    )
+    return fig
+
+
+############################################################
+### Ranked bar charts (challenges and constraints)
+############################################################
+
+CONSTRAINT_COLORS = ['#9F2A00', '#D32A00', '#F42A00', '#D9D9D9', '#F2F2F2']
+
+
+def _ranked_bar(data, column, year, color_map, title, legend_y):
+    # Filter data for the current year
+    filtered_data = data[data['year'] == year]
+    order = filtered_data[column].tolist()
+
+    # Create the bar chart
+    fig = px.bar(filtered_data,
+                 x='percentage',
+                 y=column,
+                 color='ranking',
+                 orientation='h',
+                 category_orders={column: order},
+                 color_discrete_map=color_map,
+                 template=SHARED_TEMPLATE
+                 )
+
+    # rank and movement since the previous year, on the hover of every ranking
+    labels = rank_trends(column, data).labels(year)
+    for trace in fig.data:
+        trace.update(customdata=[labels.get(item, '') for item in trace.y], hovertemplate=RANKED_BAR_MOVEMENT_HOVER)
+
+    # Update layout
+    fig.update_layout(
+        showlegend=True,
+        legend_title_text='Ranking',
+        xaxis_title='',
+        yaxis_title='',
+        font=dict(size=16),
+        xaxis=dict(
+            tickvals=list(range(0, 101, 20)),
+            ticktext=[f"{i}%" for i in range(0, 101, 20)],
+            range=[0, 100],
+            title_standoff=12,
+            tickfont=dict(size=10)
+        ),
+        yaxis=dict(tickfont=dict(size=12)),
+        title=title,
+        title_x=0.39,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=legend_y,
+            xanchor="right",
+            x=1)
+    )
+    return fig
+
+
+def challenges_chart(chal, year):
+    # Define custom order and color mapping
+    chal = chal.assign(ranking=chal['ranking'].astype(str))
+    ranking_order = chal['ranking'].unique().tolist()
+    num_colors = len(ranking_order)
+    color_values = [px.colors.sequential.GnBu[i * (len(px.colors.sequential.GnBu) - 1) // (num_colors - 1)] for i in range(num_colors)]
+    color_values = color_values[::-1]
+    color_map = {ranking: color for ranking, color in zip(ranking_order, color_values)}
+
+    return _ranked_bar(chal, 'chal', year, color_map, f'Sector-wide challenges for {year}', -0.36)
+
+
+def user_constraints_chart(uconst, year):
+    ranking_order = uconst['ranking'].unique().tolist()
+    color_map = {ranking: color for ranking, color in zip(ranking_order, CONSTRAINT_COLORS)}
+
+    return _ranked_bar(uconst, 'uconst', year, color_map, f'User Constraints for {year}', -0.56)
+
+
+def developer_constraints_chart(dconst, year):
+    #update formatting
+    dconst = dconst.assign(percentage=dconst['percentage'].apply(lambda x: f"{x:.1f}%"))
+    ranking_order = dconst['ranking'].unique().tolist()
+    color_map = {ranking: color for ranking, color in zip(ranking_order, CONSTRAINT_COLORS)}
+
+    return _ranked_bar(dconst, 'dconst', year, color_map, f'Developer Constraints for {year}', -0.56)
+
+
+############################################################
+### Performance versus potential
+############################################################
+
+PERFORMANCE_COLOR = '#C55A11'
+POTENTIAL_COLOR = '#0E4B6A'
+OTHER_COLOR = '#BFBFBF'
+HEADLINE_COLOR = '#0E4B6A'
+
+
+def potential_chart(potential, year):
+    """Ranking of every technology by current performance (left) and potential (right)."""
+    data = potential[potential['year'] == year]
+    count = len(data)
+
+    fig, ax = plt.subplots(figsize=(12, 6.75))
+    ax.set_xlim(0, 1)
+    ax.set_ylim(-count - 0.6, 2.2)
+    ax.axis('off')
+
+    left, right = 0.3, 0.69
+    x = np.linspace(left, right, 100)
+    # s-shaped link between the two ranks, flat at both ends
+    ease = (1 - np.cos(np.pi * (x - left) / (right - left))) / 2
+
+    for _, row in data.sort_values('performance').iterrows():
+        # the top three of each ranking are highlighted in both columns
+        if row['performance'] <= 3:
+            color, zorder = PERFORMANCE_COLOR, 3
+        elif row['potential'] <= 3:
+            color, zorder = POTENTIAL_COLOR, 3
+        else:
+            color, zorder = OTHER_COLOR, 2
+        y_left, y_right = -row['performance'], -row['potential']
+        ax.plot(x, y_left + (y_right - y_left) * ease, color=color, linewidth=3, zorder=zorder, solid_capstyle='round')
+        for x_rank, y_rank in ((left, y_left), (right, y_right)):
+            ax.scatter(x_rank, y_rank, s=420, color=color, edgecolor='white', linewidth=1.5, zorder=4)
+            ax.text(x_rank, y_rank, str(int(-y_rank)), ha='center', va='center', color='white', fontsize=11, zorder=5)
+        ax.text(left - 0.025, y_left, row['technology'], ha='right', va='center', fontsize=14)
+        ax.text(right + 0.035, y_right, row['technology'], ha='left', va='center', fontsize=14)
+
+    ax.text(left - 0.025, 0.1, 'Current overall\nperformance', ha='right', va='bottom', fontsize=14, weight='bold')
+    ax.text(right - 0.025, 0.1, 'Capacity to advance\nconservation', ha='left', va='bottom', fontsize=14, weight='bold')
+    ax.set_title(f'Performance and potential of\nconservation technologies in {year}', fontsize=16, weight='bold')
+    plt.tight_layout()
+    return fig
+
+
+############################################################
+### Ranked lists and reasons for optimism
+############################################################
+
+def _ranked_list(items, headline):
+    fig = plt.figure(figsize=(12, 6.75))
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 16)
+    ax.set_ylim(0, 9)
+    ax.axis('off')
+
+    # dark arrow-shaped panel holding the headline, shaded from top left to bottom right
+    panel = mpatches.Polygon([(0, 0), (4.2, 0), (5.4, 4.5), (4.2, 9), (0, 9)], closed=True, facecolor='none', edgecolor='none')
+    ax.add_patch(panel)
+    shade = np.add.outer(np.linspace(0, 1, 200), np.linspace(0, 0.4, 200))
+    gradient = ax.imshow(shade, extent=(0, 5.4, 0, 9), origin='upper', aspect='auto', zorder=1,
+                         cmap=LinearSegmentedColormap.from_list('panel', ['#0E77A8', '#0A2A3D']))
+    gradient.set_clip_path(panel)
+    ax.text(0.4, 4.5, textwrap.fill(headline, 16), ha='left', va='center', color='#FFC000', fontsize=21, zorder=2)
+
+    step = 9 / (len(items) + 0.5)
+    for i, item in enumerate(items, start=1):
+        y = 9 - i * step
+        ax.scatter(7, y, s=900, color='#0A3550', zorder=2)
+        ax.text(7, y, str(i), ha='center', va='center', color='white', fontsize=13, zorder=3)
+        ax.text(7.6, y, item, ha='left', va='center', color=HEADLINE_COLOR, fontsize=21)
+    return fig
+
+
+def work_issues_chart(workchallenge):
+    """Conservation issues respondents work on, in order of how often they were named."""
+    items = workchallenge.sort_values('order')['issue'].tolist()
+    return _ranked_list(items, 'From 2020 to 2022, respondents indicated working on the same conservation issues')
+
+
+def opportunities_chart(opportunities):
+    """Opportunities for the sector, in the order respondents ranked them."""
+    items = opportunities.sort_values('order')['opportunity'].tolist()
+    return _ranked_list(items, 'Collaboration and sharing of tools are the main opportunities identified by respondents in both years')
+
+
+# Podium layout: second place on the left, first in the middle, third on the right
+PODIUM = {1: (1, 0.62), 2: (0, 0.44), 3: (2, 0.33)}
+
+
+def optimism_chart(optimism):
+    """Top three reasons for optimism in the first and the latest survey year, as podiums."""
+    years = [optimism['year'].min(), optimism['year'].max()]
+    fig, axes = plt.subplots(1, 2, figsize=(12, 6.75))
+    for ax, year, color in zip(axes, years, [POTENTIAL_COLOR, PERFORMANCE_COLOR]):
+        for _, row in optimism[(optimism['year'] == year) & (optimism['order'] <= 3)].iterrows():
+            x, height = PODIUM[row['order']]
+            ax.bar(x, height, width=1, color=color, edgecolor='white', linewidth=1)
+            ax.text(x, height / 2, str(row['order']), ha='center', va='center', color='white', fontsize=26)
+            ax.text(x, height + 0.03, textwrap.fill(row['reason'], 14), ha='center', va='bottom',
+                    color=color, fontsize=13, weight='bold')
+        ax.set_xlim(-0.55, 2.55)
+        ax.set_ylim(0, 0.95)
+        ax.axis('off')
+        ax.set_title(f'Reasons for optimism, {year}', loc='left', fontsize=14, weight='bold')
+    fig.suptitle('Increasing accessibility and the quickly evolving nature of the field are the main reasons for optimism for most',
+                 x=0.07, ha='left', fontsize=19, color=HEADLINE_COLOR, wrap=True)
+    plt.tight_layout(rect=(0.04, 0, 0.96, 0.88))
+    return fig
+
+
+############################################################
+### Registry
+############################################################
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_')
+
+
+def all_charts(data):
+    """Yield (name, function, args) for every chart the dashboard can show.
+
+    data maps dataset names (see aggregates.DATASETS and OPTIONAL_DATASETS) to their frames.
+    """
+    demographics = data['demographics']
+    years = demographics['year'].unique()
+
+    yield 'gender', gender_chart, (gender_summary(demographics),)
+    yield 'map', map_chart, (data['map'],)
+    yield 'organizations', organization_chart, (demographics,)
+    yield 'roles', role_chart, (demographics,)
+    yield 'work_issues', work_issues_chart, (data['workchallenge'],)
+    yield 'proficiency', proficiency_chart, (data['proficiency'],)
+    for technology in data['proficiency_pie']['technology'].unique():
+        yield f'usage_pies_{slug(technology)}', usage_pies, (data['percentage_pie'], technology)
+        yield f'proficiency_pies_{slug(technology)}', proficiency_pies, (data['proficiency_pie'], technology)
+    # the respondent-level answers are optional, see aggregates.OPTIONAL_DATASETS
+    if 'proficiency_responses' in data:
+        summary = summarize(data['proficiency_responses'])
+        for technology in summary['technology'].unique():
+            yield f'proficiency_levels_{slug(technology)}', proficiency_levels_chart, (summary, technology)
+    for year in data['potential']['year'].unique():
+        yield f'potential_{year}', potential_chart, (data['potential'], year)
+    for year in years:
+        yield f'challenges_{year}', challenges_chart, (data['chal'], year)
+        yield f'user_constraints_{year}', user_constraints_chart, (data['uconst'], year)
+        yield f'developer_constraints_{year}', developer_constraints_chart, (data['dconst'], year)
+    yield 'optimism', optimism_chart, (data['optimism'],)
+    yield 'opportunities', opportunities_chart, (data['opportunities'],)
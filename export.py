@@ -0,0 +1,174 @@
+"""Downloadable exports of the data behind the dashboard.
+
+Every dataset, and every aggregate a chart is drawn from, can be exported as
+csv, parquet or json. The respondent-level datasets are only included when
+asked for (the command line does, the dashboard doesn't). Exports are written
+in chunks of rows by generators, so the full file is never built in memory.
+Writing an export returns the sha256 of its bytes, which identifies its
+content, so consumers can cache on it.
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import sys
+
+from aggregates import (DATASETS, DEMOGRAPHIC_COLUMNS, OPTIONAL_DATASETS, RESPONDENT_DATASETS,
+                        crosstab_by_year)
+
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'json': 'application/json',
+}
+
+# Rows written per chunk
+CHUNK_ROWS = 10_000
+
+# Datasets that are exported as they are read, apart from the csv index column
+TABLES = tuple(name for name, filename in {**DATASETS, **OPTIONAL_DATASETS}.items() if filename.endswith('.csv'))
+
+
+def views(data, respondent_level=False):
+    """Every exportable view of the datasets in data, by name, as functions building its dataframe."""
+    exports = {name: functools.partial(_table, data[name]) for name in TABLES
+               if name in data and (respondent_level or name not in RESPONDENT_DATASETS)}
+    for column in DEMOGRAPHIC_COLUMNS:
+        name = 'demographics_by_' + column.removeprefix('sc_')
+        exports[name] = functools.partial(crosstab_by_year, data['demographics'], column)
+    return exports
+
+
+def _table(data):
+    return data.loc[:, ~data.columns.str.startswith('Unnamed:')]
+
+
+def view(data, name, year=None, respondent_level=False):
+    """Dataframe of one view, only for the given survey year if there is one."""
+    frame = views(data, respondent_level)[name]()
+    if year is not None:
+        if 'year' not in frame.columns:
+            raise ValueError(f'{name} has no year column to filter on')
+        frame = frame[frame['year'] == year]
+    return frame
+
+
+def _csv_chunks(frame, chunk_rows):
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode()
+
+
+def _json_chunks(frame, chunk_rows):
+    # one json array of records, written a slice of records at a time
+    yield b'['
+    for start in range(0, len(frame), chunk_rows):
+        records = frame.iloc[start:start + chunk_rows].to_json(orient='records')
+        yield (',' if start else '').encode() + records[1:-1].encode()
+    yield b']'
+
+
+class _Sink(io.RawIOBase):
+    # file the parquet writer writes to, handing out what it wrote so far
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, content):
+        self.parts.append(bytes(content))
+        self.position += len(content)
+        return len(content)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        content = b''.join(self.parts)
+        self.parts.clear()
+        return content
+
+
+def _parquet_chunks(frame, chunk_rows):
+    # pyarrow comes with streamlit
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    sink = _Sink()
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        # one row group per chunk
+        for start in range(0, len(frame), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(frame.iloc[start:start + chunk_rows], schema=schema,
+                                                    preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+_CHUNKS = {'csv': _csv_chunks, 'parquet': _parquet_chunks, 'json': _json_chunks}
+
+
+class Export:
+    """A dataframe exported in one format, iterated as chunks of bytes."""
+
+    def __init__(self, frame, format, chunk_rows=CHUNK_ROWS):
+        if format not in FORMATS:
+            raise ValueError(f'unknown export format {format!r}, expected one of {", ".join(FORMATS)}')
+        self.frame = frame
+        self.format = format
+        self.chunk_rows = chunk_rows
+        self.mime = FORMATS[format]
+
+    def __iter__(self):
+        return _CHUNKS[self.format](self.frame, self.chunk_rows)
+
+    def write(self, path):
+        """Stream the export to a file, returning the hash of what was written."""
+        digest = hashlib.sha256()
+        tmp = path + '.part'
+        with open(tmp, 'wb') as f:
+            for chunk in self:
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(tmp, path)
+        return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('views', nargs='*', help='only these views (default: all)')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--year', type=int, help='only this survey year, for the views with a year column')
+    parser.add_argument('--out', default='exports', help='directory the files are written to')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    from aggregates import load_datasets
+    data = load_datasets()
+    names = args.views or list(views(data, respondent_level=True))
+    os.makedirs(args.out, exist_ok=True)
+    manifest = {}
+    for name in names:
+        frame = view(data, name, respondent_level=True)
+        if args.year is not None:
+            if 'year' not in frame.columns:
+                print(f'{name}: skipped, no year column')
+                continue
+            frame = frame[frame['year'] == args.year]
+            name = f'{name}_{args.year}'
+        for format in args.formats:
+            filename = f'{name}.{format}'
+            sha256 = Export(frame, format, args.chunk_rows).write(os.path.join(args.out, filename))
+            manifest[filename] = {'rows': len(frame), 'sha256': sha256}
+            print(f'{filename}: {len(frame)} rows, sha256 {sha256[:12]}')
+
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
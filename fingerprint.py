@@ -0,0 +1,124 @@
+#deterministic fingerprints for the dashboard charts
+#
+#a chart's fingerprint covers everything its output depends on: the data it
+#is drawn from, its other arguments, the source of the function that draws it
+#(and of the helpers, classes and upper case constants that function uses from
+#this repo; lower case globals such as caches are state, not code) and the
+#versions of the plotting libraries. The same fingerprint means the same chart,
+#so fingerprints can key caches that survive deploys.
+import functools
+import hashlib
+import inspect
+import os
+import textwrap
+import types
+from importlib import metadata
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Libraries whose version can change how a chart looks
+LIBRARIES = ('matplotlib', 'pandas', 'plotly', 'mizani', 'plotnine', 'geopandas')
+
+# Plain values that are hashed by their repr when a chart function uses them as
+# constants (upper case names)
+_CONSTANTS = (str, int, float, bool, type(None), tuple, list, dict)
+
+
+def _library_versions():
+    versions = []
+    for name in LIBRARIES:
+        try:
+            versions.append(f'{name}=={metadata.version(name)}')
+        except metadata.PackageNotFoundError:
+            versions.append(f'{name}==none')
+    return '\n'.join(versions)
+
+
+def data_fingerprint(data):
+    """Hash of a dataframe's columns, dtypes, index and values."""
+    digest = hashlib.sha256()
+    geometry = getattr(data, '_geometry_column_name', None)
+    if geometry is not None:
+        # geometries are hashed through their WKB, not their (lossy) text form
+        digest.update(b''.join(data[geometry].to_wkb()))
+        data = pd.DataFrame(data.drop(columns=geometry))
+    digest.update(repr(list(data.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in data.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _is_local(obj):
+    try:
+        return os.path.dirname(os.path.abspath(inspect.getsourcefile(obj))) == ROOT
+    except TypeError:
+        return False
+
+
+def _names(code):
+    # global names used by a function, including inside its lambdas and comprehensions
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+
+def _code_sources(function, seen):
+    if function in seen:
+        return []
+    seen.add(function)
+    sources = [textwrap.dedent(inspect.getsource(function))]
+    for name in sorted(_names(function.__code__)):
+        # co_names also holds attribute names; only module globals count
+        if name not in function.__globals__:
+            continue
+        value = function.__globals__[name]
+        if isinstance(value, types.FunctionType) and _is_local(value):
+            sources += _code_sources(value, seen)
+        elif isinstance(value, type) and _is_local(value):
+            sources += _class_sources(value, seen)
+        elif isinstance(value, _CONSTANTS) and name.isupper():
+            # lower case globals are module state, like caches, not constants
+            sources.append(f'{name} = {value!r}')
+    return sources
+
+
+def _class_sources(cls, seen):
+    # a class counts with the globals its methods use
+    if cls in seen:
+        return []
+    seen.add(cls)
+    sources = [textwrap.dedent(inspect.getsource(cls))]
+    for attribute in vars(cls).values():
+        # plain, class and static methods and properties; their source is already in the class's
+        method = getattr(attribute, '__func__', getattr(attribute, 'fget', attribute))
+        if isinstance(method, types.FunctionType):
+            sources += _code_sources(method, seen)[1:]
+    return sources
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(function):
+    """Hash of a chart function's source and of the local helpers and constants it uses."""
+    sources = _code_sources(function, set())
+    return hashlib.sha256('\n'.join(sources + [_library_versions()]).encode()).hexdigest()
+
+
+def _argument(value):
+    if isinstance(value, pd.DataFrame):
+        return 'data:' + data_fingerprint(value)
+    # numpy scalars and python scalars of the same value hash alike
+    if hasattr(value, 'item'):
+        value = value.item()
+    return f'{type(value).__name__}:{value!r}'
+
+
+def chart_fingerprint(function, *args, **kwargs):
+    """Fingerprint of the chart function(*args, **kwargs) draws."""
+    parts = [f'{function.__module__}.{function.__qualname__}', code_fingerprint(function)]
+    parts += [_argument(value) for value in args]
+    parts += [f'{key}={_argument(kwargs[key])}' for key in sorted(kwargs)]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
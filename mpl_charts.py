@@ -0,0 +1,140 @@
+#native matplotlib versions of the plotnine charts
+#
+#genderplot and profplot are a fixed stacked bar and a bar chart with a line
+#overlay, so they are drawn directly instead of going through plotnine's scale
+#training, position_stack and theme resolution. Sizes, colours and spacing below
+#reproduce plotnine's theme_minimal output; compare_backends.py checks that the
+#two backends stay visually equivalent.
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Patch
+from mizani.breaks import extended_breaks
+
+FIGURE_SIZE = (6.4, 4.8)
+TEXT_COLOR = '#423f3f'
+GRID_COLOR = '#E5E5E5'
+MINOR_GRID_COLOR = '#FAFAFA'
+
+# Spacing in inches, as laid out by plotnine at its default figure size
+EDGE = 0.064
+LEGEND_GAP = 0.192
+# Offset of tick labels from the panel in points (tick length + pad)
+TICK_SPACE = 4.75
+
+# Continuous scales expand 5% each side, discrete ones 0.6 of a category
+CONTINUOUS_EXPAND = 0.05
+DISCRETE_EXPAND = 0.6
+
+
+def _panel(fig, xlim, breaks, labels, categories):
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_facecolor('white')
+    ax.set_axisbelow(True)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    ax.set_xlim(xlim)
+    ax.set_xticks(breaks, labels)
+    ax.set_xticks((breaks[:-1] + breaks[1:]) / 2, minor=True)
+    ax.set_ylim(1 - DISCRETE_EXPAND, len(categories) + DISCRETE_EXPAND)
+    ax.set_yticks(np.arange(1, len(categories) + 1), categories)
+
+    ax.tick_params(which='both', length=0, pad=TICK_SPACE, labelsize=8, labelcolor=TEXT_COLOR)
+    ax.grid(which='major', color=GRID_COLOR, linewidth=0.8)
+    ax.grid(which='minor', axis='x', color=MINOR_GRID_COLOR, linewidth=1.0)
+    return ax
+
+
+def _continuous_limits(high):
+    # scale range is 0..high, expanded like plotnine does
+    expand = high * CONTINUOUS_EXPAND
+    return (-expand, high + expand)
+
+
+def _layout(fig, ax, title, xlabel, xlabel_size, xlabel_color, legend=None):
+    # position the panel from the sizes of the drawn text, the way plotnine does
+    renderer = fig.canvas.get_renderer()
+    width, height = fig.get_size_inches() * fig.dpi
+    edge = EDGE * fig.dpi
+    tick_space = TICK_SPACE * fig.dpi / 72
+
+    title = fig.text(0, 1 - edge / height, title, ha='center', va='top', fontsize=11,
+                     weight='bold', color=TEXT_COLOR, linespacing=0.9, multialignment='left')
+    xlabel = fig.text(0, 2 * edge / height, xlabel, ha='center', va='bottom',
+                      fontsize=xlabel_size, color=xlabel_color)
+
+    ylabels = max(t.get_window_extent(renderer).width for t in ax.get_yticklabels())
+    xlabels = max(t.get_window_extent(renderer).height for t in ax.get_xticklabels())
+
+    left = 2 * edge + ylabels + tick_space
+    bottom = 3 * edge + xlabel.get_window_extent(renderer).height + xlabels + tick_space
+    top = height - 3 * edge - title.get_window_extent(renderer).height
+    right = width - edge
+    if legend is not None:
+        right -= legend.get_window_extent(renderer).width + LEGEND_GAP * fig.dpi
+
+    ax.set_position([left / width, bottom / height, (right - left) / width, (top - bottom) / height])
+    center = (left + right) / 2 / width
+    title.set_x(center)
+    xlabel.set_x(center)
+    if legend is not None:
+        legend.set_bbox_to_anchor((1 - edge / width, (top + bottom) / 2 / height), transform=fig.transFigure)
+
+
+def gender_chart(df_summary):
+    """Horizontal stacked bar of the gender split per year (same output as plotnine's genderplot)."""
+    fig = plt.figure(figsize=FIGURE_SIZE, facecolor='white')
+    years = sorted(df_summary['year'].unique())
+    genders = sorted(df_summary['sc_gender'].unique())
+    colors = dict(zip(genders, ['#DD7E3B', '#0E87BE']))
+
+    high = df_summary.groupby('year')['percentage'].sum().max()
+    breaks = extended_breaks()((0, high))
+    ax = _panel(fig, _continuous_limits(high), breaks, ['{:.0f}%'.format(val) for val in breaks],
+                [str(year) for year in years])
+
+    # plotnine stacks the last fill level first
+    for i, year in enumerate(years, start=1):
+        left = 0
+        rows = df_summary[df_summary['year'] == year].set_index('sc_gender')
+        for gender in reversed(genders):
+            if gender not in rows.index:
+                continue
+            value = rows.loc[gender, 'percentage']
+            ax.barh(i, value, left=left, height=0.5, color=colors[gender], linewidth=0, zorder=1)
+            ax.text(left + value / 2, i, rows.loc[gender, 'percentage2'], ha='center', va='center',
+                    color='white', fontsize=8, zorder=2)
+            left += value
+
+    legend = fig.legend(handles=[Patch(color=colors[gender], label=gender) for gender in genders],
+                        title='Gender', loc='center right', frameon=False, alignment='left',
+                        fontsize=8.8, title_fontsize=11, borderpad=0, borderaxespad=0,
+                        handlelength=1.8, handleheight=1.8, handletextpad=0.34, labelspacing=0.23)
+    _layout(fig, ax, 'Gender distribution for respondents across the years',
+            'Percentage of respondents', 11, 'black', legend)
+    return fig
+
+
+def proficiency_chart(proficiency):
+    """Usage bars with the average proficiency line (same output as plotnine's profplot)."""
+    fig = plt.figure(figsize=FIGURE_SIZE, facecolor='white')
+    data = proficiency.sort_values('order', ascending=False)
+    y = np.arange(1, len(data) + 1)
+    usage = data['percentage'].to_numpy()
+    prof = data['average_proficiency'].to_numpy() / 10
+
+    high = max(usage.max(), prof.max())
+    breaks = extended_breaks()((0, high))
+    ax = _panel(fig, _continuous_limits(high), breaks, ['{:.0f}%'.format(val * 100) for val in breaks],
+                data['technology'].tolist())
+
+    ax.barh(y, usage, height=0.9, color='#0E87BE', linewidth=0, zorder=1)
+    ax.scatter(prof, y, s=np.pi * 4, color='#3B3838', linewidths=0.886, zorder=2)
+    ax.plot(prof, y, color='#3B3838', linewidth=0.886, solid_capstyle='butt', zorder=3)
+    for value, i in zip(usage, y):
+        ax.text(value / 2, i, '{:.0%}'.format(value), ha='center', va='center',
+                color='white', fontsize=8, zorder=4)
+
+    _layout(fig, ax, 'Conservation technology usage \n              and proficiency',
+            'Percentage of respondents', 10, TEXT_COLOR)
+    return fig
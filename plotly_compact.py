@@ -0,0 +1,175 @@
+#compact serialization for the dashboard's plotly charts
+#
+#every st.plotly_chart call ships the full figure json. Most of that is the
+#default template (styling for every trace type plotly knows about) and
+#attributes plotly express writes on every trace even when they hold the
+#plotly.js default. compact_spec() keeps only what the browser needs to draw
+#the same chart.
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.utils
+
+SHARED_TEMPLATE = 'soct'
+
+# Template the shared one is built on: streamlit's, whose placeholder colours the
+# dashboard's frontend swaps for the theme colours
+BASE_TEMPLATE = 'streamlit'
+
+# Hover labels shared by the ranked bar sections and the pie sections. The ranking
+# is read from the trace name, so the charts don't need to ship it as customdata
+RANKED_BAR_HOVER = ("<b>%{y}</b> <br>" +
+                    "Ranking: %{fullData.name} <br>" +
+                    "Percentage: %{x:,0.00f}% <br>" +
+                    "<extra></extra>")
+# Ranked bar sections that also show each item's rank movement (see trends.py),
+# carried as customdata
+RANKED_BAR_MOVEMENT_HOVER = ("<b>%{y}</b> <br>" +
+                             "%{customdata} <br>" +
+                             "Ranking: %{fullData.name} <br>" +
+                             "Percentage: %{x:,0.00f}% <br>" +
+                             "<extra></extra>")
+PIE_HOVER = ("<b>%{label}</b> <br>" +
+             "%{value:,.1%} <br>" +
+             "<extra></extra>")
+
+# Trace attributes plotly express sets to what plotly.js would use anyway
+_TRACE_DEFAULTS = {
+    'xaxis': 'x',
+    'yaxis': 'y',
+    'showlegend': True,
+    'legendgroup': '',
+    'textposition': 'auto',
+}
+
+# Trace attributes that can be typed-array encoded
+_DATA_ARRAYS = ('x', 'y', 'z', 'values')
+
+# Trace types that fall back on the template's continuous colorscales
+_CONTINUOUS_TRACES = {'heatmap', 'contour', 'histogram2d', 'histogram2dcontour', 'surface',
+                      'choropleth', 'choroplethmapbox', 'densitymapbox', 'parcoords'}
+
+
+def register_template():
+    """Register the shared template, built on BASE_TEMPLATE. Runs when this module is imported."""
+    # this module only defines streamlit's plotly template
+    import streamlit.elements.lib.streamlit_plotly_theme
+    base = pio.templates[BASE_TEMPLATE]
+    template = go.layout.Template(layout=base.layout)
+    template.data.bar = [go.Bar(hovertemplate=RANKED_BAR_HOVER, orientation='h')]
+    template.data.pie = [go.Pie(hovertemplate=PIE_HOVER, hole=0.6, sort=False, showlegend=False)]
+    pio.templates[SHARED_TEMPLATE] = template
+    return template
+
+
+register_template()
+
+
+def _prune(value):
+    # drop empty strings from nested attributes (e.g. marker.pattern.shape) and
+    # the empty containers they leave behind
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in ('', {}, None)}
+    return value
+
+
+def _typed_array(values):
+    array = np.asarray(values)
+    if array.ndim != 1 or array.dtype.kind not in 'iuf':
+        return values
+    if array.dtype.kind in 'iu' and np.abs(array).max(initial=0) < 2**31:
+        dtype = 'i4'
+    else:
+        dtype = 'f8'
+    data = array.astype('<' + dtype).tobytes()
+    encoded = {'dtype': dtype, 'bdata': base64.b64encode(data).decode('ascii')}
+    # short arrays are smaller as plain json
+    if len(encoded['bdata']) + 28 >= len(json.dumps(array.tolist())):
+        return values
+    return encoded
+
+
+def _compact_trace(trace, template_defaults, barmode, unique_names, typed_arrays):
+    trace = dict(trace)
+    for key, value in list(trace.items()):
+        if isinstance(value, dict):
+            value = trace[key] = _prune(value)
+            if not value:
+                del trace[key]
+        elif key == 'type':
+            continue
+        elif key in template_defaults:
+            if template_defaults[key] == value:
+                del trace[key]
+        elif key in _TRACE_DEFAULTS and _TRACE_DEFAULTS[key] == value:
+            del trace[key]
+    # bar grouping only matters when bars are drawn side by side
+    if barmode != 'group':
+        trace.pop('alignmentgroup', None)
+        trace.pop('offsetgroup', None)
+    if unique_names and trace.get('legendgroup') == trace.get('name'):
+        trace.pop('legendgroup', None)
+    if typed_arrays:
+        for key in _DATA_ARRAYS:
+            if key in trace:
+                trace[key] = _typed_array(trace[key])
+    return trace
+
+
+def compact_spec(fig, typed_arrays=False):
+    """Return the figure as a plotly json dict with defaults and repeated data removed."""
+    spec = json.loads(pio.to_json(fig, validate=False))
+    layout = spec.setdefault('layout', {})
+    traces = spec.get('data', [])
+    trace_types = {trace.get('type', 'scatter') for trace in traces}
+
+    # keep the template's layout and the trace defaults of the types on screen
+    template = layout.get('template', {})
+    template['data'] = {k: v for k, v in template.get('data', {}).items() if k in trace_types}
+    if not template['data']:
+        del template['data']
+    traces_json = json.dumps(traces)
+    if not (trace_types & _CONTINUOUS_TRACES or 'colorscale' in traces_json or 'coloraxis' in traces_json):
+        template.get('layout', {}).pop('colorscale', None)
+        template.get('layout', {}).pop('coloraxis', None)
+
+    names = [trace.get('name') for trace in traces]
+    unique_names = len(names) == len(set(names))
+    barmode = layout.get('barmode')
+    spec['data'] = [
+        _compact_trace(trace, template.get('data', {}).get(trace.get('type', 'scatter'), [{}])[0],
+                       barmode, unique_names, typed_arrays)
+        for trace in traces
+    ]
+
+    for name, axis in layout.items():
+        if name.startswith(('xaxis', 'yaxis')) and axis.get('domain') == [0.0, 1.0]:
+            del axis['domain']
+    return spec
+
+
+def payload_bytes(spec):
+    """Size in bytes of the json that is sent to the browser for a figure or spec."""
+    return len(json.dumps(spec, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8'))
+
+
+class CompactFigure(go.Figure):
+    """Figure that serializes to a precomputed spec.
+
+    st.plotly_chart re-validates plain dicts, which would reject typed arrays,
+    but trusts figure objects and only calls to_dict() on them.
+    """
+
+    def __init__(self, spec):
+        super().__init__()
+        self._compact_spec = spec
+
+    def to_dict(self):
+        return self._compact_spec
+
+    def to_plotly_json(self):
+        return self._compact_spec
@@ -0,0 +1,66 @@
+#plotnine versions of the gender and proficiency charts
+#
+#this is the reference rendering; mpl_charts draws the same figures without
+#plotnine and compare_backends.py checks the two against each other
+from plotnine import ggplot, aes, geom_bar, scale_y_continuous, geom_text, coord_flip, theme, element_text, labs, scale_fill_manual, theme_minimal, geom_point, geom_line, position_stack, element_rect
+
+
+def gender_chart(df_summary):
+    genderplot = (ggplot(df_summary, aes(y='percentage', x='factor(year)', fill='factor(sc_gender)')) +
+                geom_bar(stat='identity', width=0.5) +
+                geom_text(
+                        aes(label='percentage2'),
+                        position=position_stack(vjust=0.5),
+                        color='white',
+                        size=8) +
+                coord_flip() +
+                labs(
+                        title = 'Gender distribution for respondents across the years',
+                        x='',
+                        y='Percentage of respondents',
+                        fill='Gender'
+                        ) +
+                scale_y_continuous(labels=lambda l: ['{:.0f}%'.format(val) for val in l]) +
+                scale_fill_manual(values=['#DD7E3B', '#0E87BE']) +
+                theme_minimal() +
+                theme(
+                        axis_text=element_text(size=8, color="#423f3f"),
+                        plot_title=element_text(size=11, color="#423f3f",  face="bold", hjust=0.5),
+                        axis_title_y=element_text(size=10, colour="#423f3f"),
+                        plot_background = element_rect(fill = "white",color='white'),
+                        panel_background = element_rect(fill = "white",color='white')
+                        )
+                )
+    return ggplot.draw(genderplot)
+
+
+def proficiency_chart(proficiency):
+    profplot = (ggplot(proficiency, aes(x='reorder(technology, -order)', y='percentage')) +
+                        geom_bar(stat='identity', fill='#0E87BE') +
+                        geom_point(aes(y='average_proficiency/10'), color='#3B3838') +
+                        geom_line(aes(y='average_proficiency/10', group=1), color='#3B3838') +
+                        labs(
+                            title='Conservation technology usage \n              and proficiency',
+                            x='',
+                            y='Percentage of respondents'
+                            ) +
+                        geom_text(
+                            aes(label='percentage'),
+                            position=position_stack(vjust=0.5),
+                            color='white',
+                            size=8,
+                            format_string='{:.0%}'
+                            ) +
+                        scale_y_continuous(labels=lambda l: ['{:.0f}%'.format(val*100) for val in l]) +
+                        theme_minimal() +
+                        coord_flip() +
+                        theme(
+                            axis_text=element_text(size=8, color="#423f3f"),
+                            plot_title=element_text(size=11, color="#423f3f",  face="bold", hjust=0.5),
+                            axis_title_x=element_text(size=10, color="#423f3f"),
+                            plot_background = element_rect(fill = "white",color='white'),
+                            panel_background = element_rect(fill = "white",color='white')
+                            ) +
+                        scale_fill_manual(values=['#0E87BE', '#DD7E3B'], guide=False)
+                )
+    return ggplot.draw(profplot)
@@ -0,0 +1,87 @@
+#proficiency distributions from the respondent-level answers
+#
+#the respondent table has one row per respondent, survey year and technology
+#they rated, with their proficiency from 1 (novice) to 5 (expert):
+#
+#    respondent, year, technology, proficiency
+#
+#summarize() turns it into one row per technology and year: the share of
+#respondents at every level, the mean, the median, the share rating themselves
+#4 or 5 (what the pies call highly proficient) and the change of those since
+#the previous year. All technologies and years are counted in a single pass
+#over the respondents. Answers without a technology or year are left out, and
+#anything but a whole number from 1 to 5 is an error. The last few summaries
+#are kept per dataset hash, so reruns on the same data cost one hash.
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from fingerprint import data_fingerprint
+
+LEVELS = np.arange(1, 6)
+SHARE_COLUMNS = [f'share_{level}' for level in LEVELS]
+
+# Levels counted as highly proficient
+HIGH_LEVELS = (4, 5)
+
+# Measures whose change since the previous survey year is reported
+SHIFT_COLUMNS = ['mean', 'median', 'high']
+
+
+def _summarize(responses):
+    # answers without a technology or year can't be counted anywhere
+    responses = responses.dropna(subset=['technology', 'year', 'proficiency']).astype({'year': int})
+    values = responses['proficiency'].to_numpy(dtype=float)
+    if not np.isin(values, LEVELS).all():
+        raise ValueError(f'proficiency must be a whole number from {LEVELS[0]} to {LEVELS[-1]}')
+    levels = values.astype(int)
+
+    # number every technology and year, then count all levels of all of them at once
+    technologies, technology_names = pd.factorize(responses['technology'], sort=True)
+    years, year_values = pd.factorize(responses['year'], sort=True)
+    groups = technologies * len(year_values) + years
+    counts = np.bincount(groups * len(LEVELS) + levels - LEVELS[0],
+                         minlength=len(technology_names) * len(year_values) * len(LEVELS)).reshape(-1, len(LEVELS))
+    # not every technology was asked about in every year
+    index = pd.MultiIndex.from_product([technology_names, year_values], names=['technology', 'year'])
+    asked = counts.sum(axis=1) > 0
+    counts, index = counts[asked], index[asked]
+    totals = counts.sum(axis=1)
+
+    # the median is the mean of the two middle answers, read off the cumulative counts
+    cumulative = counts.cumsum(axis=1)
+    lower = (cumulative <= ((totals - 1) // 2)[:, None]).sum(axis=1) + LEVELS[0]
+    upper = (cumulative <= (totals // 2)[:, None]).sum(axis=1) + LEVELS[0]
+
+    summary = pd.DataFrame(counts / totals[:, None], columns=SHARE_COLUMNS, index=index).reset_index()
+    summary.insert(2, 'respondents', totals)
+    summary['mean'] = counts @ LEVELS / totals
+    summary['median'] = (lower + upper) / 2
+    summary['high'] = counts[:, np.isin(LEVELS, HIGH_LEVELS)].sum(axis=1) / totals
+
+    # rows are sorted by technology and year, so the previous row of a technology is the
+    # last year it was asked about
+    changes = summary.groupby('technology', sort=False)[SHIFT_COLUMNS].diff()
+    for column in SHIFT_COLUMNS:
+        summary[f'{column}_change'] = changes[column]
+    return summary
+
+
+# Number of summaries kept; the least recently used one goes first
+MAX_SUMMARIES = 8
+
+# Summaries computed so far, by data fingerprint of the respondent table
+_summaries = OrderedDict()
+
+
+def summarize(responses):
+    """Proficiency distribution, mean, median and their change per technology and year."""
+    key = data_fingerprint(responses)
+    if key in _summaries:
+        _summaries.move_to_end(key)
+    else:
+        _summaries[key] = _summarize(responses)
+        if len(_summaries) > MAX_SUMMARIES:
+            _summaries.popitem(last=False)
+    return _summaries[key]
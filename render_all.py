@@ -0,0 +1,120 @@
+"""Batch render every dashboard chart to image files.
+
+Charts are drawn in parallel worker processes, each loading the datasets once.
+The out directory keeps a manifest of the fingerprint and save options every
+file was drawn with, so charts whose data, code and options did not change are
+not drawn again. matplotlib charts are saved with matplotlib itself, plotly
+charts with kaleido (in requirements.txt). If kaleido is missing, as in a
+broken install, the plotly charts are skipped and the script exits with status 1.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+
+FORMATS = ('png', 'svg', 'pdf')
+MANIFEST = 'manifest.json'
+
+# Options every matplotlib chart is saved with, besides the dpi
+SAVE_OPTIONS = {'bbox_inches': 'tight'}
+
+# Chart registry of the current worker process, filled by _init_worker
+_registry = {}
+
+
+def _init_worker():
+    from aggregates import load_datasets
+    from charts import all_charts
+    _registry.update((name, (function, args)) for name, function, args in all_charts(load_datasets()))
+
+
+def _render(name, out, formats, dpi):
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    function, args = _registry[name]
+    start = time.perf_counter()
+    fig = function(*args)
+    if isinstance(fig, Figure):
+        for extension in formats:
+            fig.savefig(os.path.join(out, f'{name}.{extension}'), dpi=dpi, **SAVE_OPTIONS)
+        plt.close(fig)
+    elif importlib.util.find_spec('kaleido') is not None:
+        # the dashboard's frontend makes room for long tick labels; a static export has to be told
+        fig.update_xaxes(automargin=True).update_yaxes(automargin=True)
+        for extension in formats:
+            fig.write_image(os.path.join(out, f'{name}.{extension}'), scale=dpi / 100)
+    else:
+        return name, 'skipped, plotly export needs kaleido', time.perf_counter() - start
+    return name, 'rendered', time.perf_counter() - start
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('charts', nargs='*', help='only these charts (default: all)')
+    parser.add_argument('--out', default='rendered', help='directory the files are written to')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--dpi', type=int, default=200, help='resolution of the png files')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--force', action='store_true', help='draw charts even if they are up to date')
+    args = parser.parse_args()
+
+    from aggregates import load_datasets
+    from charts import all_charts
+    from fingerprint import chart_fingerprint
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST)
+    manifest = _read_manifest(manifest_path)
+
+    pending = {}
+    for name, function, chart_args in all_charts(load_datasets()):
+        if args.charts and name not in args.charts:
+            continue
+        # a file is up to date when it was drawn from the same fingerprint with the same options
+        options = json.dumps({**SAVE_OPTIONS, 'dpi': args.dpi}, sort_keys=True)
+        fingerprint = hashlib.sha256(f'{chart_fingerprint(function, *chart_args)}\n{options}'.encode()).hexdigest()
+        files = [os.path.join(args.out, f'{name}.{extension}') for extension in args.formats]
+        if (not args.force and manifest.get(name) == fingerprint and all(map(os.path.exists, files))):
+            print(f'{name}: up to date')
+        else:
+            pending[name] = fingerprint
+
+    start = time.perf_counter()
+    skipped = []
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render, name, args.out, args.formats, args.dpi) for name in pending]
+        for future in as_completed(futures):
+            name, status, seconds = future.result()
+            if status == 'rendered':
+                manifest[name] = pending[name]
+            else:
+                skipped.append(name)
+            print(f'{name}: {status} ({seconds:.2f}s)')
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    print(f'{len(pending)} charts in {time.perf_counter() - start:.1f}s')
+    if skipped:
+        print(f'{len(skipped)} charts were not rendered; kaleido is missing, install requirements.txt')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+#runtime switches for the dashboard, read from the environment so a deployment
+#can flip them without touching the code
+import os
+
+
+def _flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Serialize plotly charts through plotly_compact (shared template, trimmed traces)
+PLOTLY_COMPACT = _flag('SOCT_PLOTLY_COMPACT', True)
+
+# Send numeric arrays base64-encoded. Needs plotly.js >= 2.28 in the browser;
+# the plotly.js bundled with streamlit 1.25 is older, so this stays off by default
+PLOTLY_TYPED_ARRAYS = _flag('SOCT_PLOTLY_TYPED_ARRAYS', False)
+
+# Show the serialized size of every plotly chart under it
+REPORT_PAYLOAD_BYTES = _flag('SOCT_REPORT_PAYLOAD_BYTES', False)
+
+# Backend for the gender and proficiency charts: 'matplotlib' draws them directly,
+# 'plotnine' goes through the original ggplot definitions
+CHART_BACKEND = os.environ.get('SOCT_CHART_BACKEND', 'matplotlib').strip().lower()
+if CHART_BACKEND not in ('matplotlib', 'plotnine'):
+    raise ValueError(f"SOCT_CHART_BACKEND must be 'matplotlib' or 'plotnine', not {CHART_BACKEND!r}")
+
+# Directory rendered charts are cached in, keyed by their fingerprint
+CHART_CACHE_DIR = os.environ.get('SOCT_CHART_CACHE_DIR', '.chart_cache')
@@ -0,0 +1,143 @@
+"""Snapshot regression check for every chart in the dashboard.
+
+Renders each chart headlessly and compares it with the stored snapshot in
+snapshots/: matplotlib charts as png images, plotly charts as the compact json
+spec the browser receives. The chart fingerprints are stored alongside, so the
+check also catches a chart whose output changed while its fingerprint did not,
+which would make the fingerprint unsafe as a cache key.
+
+check exits with status 1 when a chart no longer matches its snapshot.
+"""
+import argparse
+import json
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+
+SNAPSHOT_DIR = 'snapshots'
+
+# The same renderer reproduces a snapshot to about 1e-8, so any visible change
+# fails: a mean pixel difference above 1e-4 or more than 0.05% of pixels changed
+THRESHOLD = 1e-4
+MAX_CHANGED = 5e-4
+FINGERPRINTS = os.path.join(SNAPSHOT_DIR, 'fingerprints.json')
+
+# Synthetic respondent-level proficiency answers. The real ones are optional
+# (aggregates.OPTIONAL_DATASETS), so the charts drawn from them are always
+# checked against these instead
+RESPONSES_FIXTURE = os.path.join(SNAPSHOT_DIR, 'fixtures', 'proficiency_responses.csv')
+
+
+def render(fig, dpi=100):
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(float) / 255
+    plt.close(fig)
+    return pixels
+
+
+def pixel_diff(a, b):
+    """Mean absolute difference and share of visibly different pixels of two RGB images."""
+    if a.shape != b.shape:
+        return 1.0, 1.0
+    diff = np.abs(a - b).max(axis=-1)
+    return diff.mean(), (diff > 0.1).mean()
+
+
+def _output(fig):
+    # what is compared: pixels for matplotlib, the compact spec for plotly
+    from plotly_compact import compact_spec
+    if isinstance(fig, Figure):
+        return 'png', render(fig)
+    return 'json', compact_spec(fig)
+
+
+def _load(path, kind):
+    if not os.path.exists(path):
+        return None
+    if kind == 'png':
+        return plt.imread(path)[..., :3].astype(float)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(path, kind, output):
+    if kind == 'png':
+        plt.imsave(path, output)
+    else:
+        with open(path, 'w') as f:
+            json.dump(output, f, indent=1, sort_keys=True)
+            f.write('\n')
+
+
+def _matches(kind, stored, output, threshold, max_changed):
+    if stored is None:
+        return False
+    if kind == 'png':
+        mean, share = pixel_diff(stored, output)
+        return mean <= threshold and share <= max_changed
+    # round trip through json so tuples and numpy values compare like the stored file
+    return stored == json.loads(json.dumps(output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', choices=['check', 'update'], default='check')
+    parser.add_argument('charts', nargs='*', help='only these charts (default: all)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='largest mean absolute pixel difference allowed (0-1)')
+    parser.add_argument('--max-changed', type=float, default=MAX_CHANGED,
+                        help='largest share of visibly changed pixels allowed (0-1)')
+    args = parser.parse_args()
+
+    import pandas as pd
+    from aggregates import load_datasets
+    from charts import all_charts
+    from fingerprint import chart_fingerprint
+
+    data = load_datasets()
+    data['proficiency_responses'] = pd.read_csv(RESPONSES_FIXTURE)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    fingerprints = _load(FINGERPRINTS, 'json') or {}
+    failed = False
+    for name, function, chart_args in all_charts(data):
+        if args.charts and name not in args.charts:
+            continue
+        fingerprint = chart_fingerprint(function, *chart_args)
+        kind, output = _output(function(*chart_args))
+        path = os.path.join(SNAPSHOT_DIR, f'{name}.{kind}')
+        matches = _matches(kind, _load(path, kind), output, args.threshold, args.max_changed)
+
+        if args.command == 'update':
+            if not matches:
+                _save(path, kind, output)
+            fingerprints[name] = fingerprint
+            print(f'{name}: {"unchanged" if matches else "updated"}')
+            continue
+
+        if name not in fingerprints:
+            status = 'new, run update'
+        elif not matches and fingerprint == fingerprints[name]:
+            status = 'CHANGED WITH THE SAME FINGERPRINT'
+        elif not matches:
+            status = 'CHANGED'
+        elif fingerprint != fingerprints[name]:
+            status = 'ok (new fingerprint)'
+        else:
+            status = 'ok'
+        failed |= not status.startswith('ok')
+        print(f'{name}: {status}')
+
+    if args.command == 'update':
+        _save(FINGERPRINTS, 'json', fingerprints)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
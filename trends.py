@@ -0,0 +1,174 @@
+#year-over-year rank movements for the ranked survey questions
+#
+#every item of a ranked dataset gets its rank in each year (1 = most
+#significant), the change since the previous year and a status: 'first' in the
+#first survey year, then 'up', 'down', 'same' or 'new', plus a 'dropped' row
+#for items that were no longer asked. The results feed the hover text of the
+#ranked bar charts and the captions under them.
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Ranked datasets: the column naming the items, and whether a higher order means
+# a more significant item (chal is ordered bottom to top, like its bar chart)
+RANKED = {
+    'chal': ('chal', True),
+    'uconst': ('uconst', False),
+    'dconst': ('dconst', False),
+}
+
+COLUMNS = ['year', 'item', 'rank', 'previous_rank', 'delta', 'status']
+
+
+def ordinal(number):
+    number = int(number)
+    if 10 <= number % 100 <= 20:
+        return f'{number}th'
+    return f'{number}{ {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")}'
+
+
+def _join(words):
+    return words[0] if len(words) == 1 else ', '.join(words[:-1]) + ' and ' + words[-1]
+
+
+class RankTrends:
+    """Rank, change since the previous year and status of every item of a ranked dataset."""
+
+    def __init__(self, column, descending=False):
+        self.column = column
+        self.descending = descending
+        # one row per item and year, sorted by year and then rank; dropped items
+        # have no rank and come last in their year. Appending a year only adds
+        # rows at the end, so the table never has to be sorted again
+        self.table = pd.DataFrame(columns=COLUMNS)
+        self._orders = {}
+        # hash of the rows every year was ranked from
+        self._fingerprints = {}
+
+    @property
+    def years(self):
+        return list(self._orders)
+
+    def _ranks(self, rows):
+        # one order per item; turned into ranks counted from the most significant item
+        orders = rows.drop_duplicates(self.column).set_index(self.column)['order']
+        ranks = orders.rank(method='min', ascending=not self.descending).astype(int)
+        return ranks.sort_values(kind='stable')
+
+    def _year_fingerprints(self, data):
+        # every row is hashed once, then the hashes of each year's rows together
+        rows = pd.util.hash_pandas_object(data[['year', self.column, 'order']], index=False).to_numpy()
+        years = data['year'].to_numpy()
+        return {year: hashlib.sha256(rows[years == year].tobytes()).hexdigest() for year in np.unique(years)}
+
+    def covers(self, data):
+        """Whether data holds the same rows as this table was ranked from for every year in it."""
+        if not self._orders:
+            return True
+        known = self._year_fingerprints(data[data['year'] <= self.years[-1]])
+        return known == self._fingerprints
+
+    def append(self, data):
+        """Add the years in data, which must all come after the years already in the table."""
+        new_years = sorted(data['year'].unique())
+        if self._orders and new_years and new_years[0] <= self.years[-1]:
+            raise ValueError(f'year {new_years[0]} is not after {self.years[-1]}, the last year in the table')
+        if not new_years:
+            return self
+
+        fingerprints = self._year_fingerprints(data)
+        blocks = [self.table] if len(self.table) else []
+        for year in new_years:
+            ranks = self._ranks(data[data['year'] == year])
+            previous = pd.Series(self._orders[self.years[-1]]) if self._orders else None
+            block = pd.DataFrame({'year': year, 'item': ranks.index, 'rank': ranks.to_numpy()})
+            if previous is None:
+                block['previous_rank'] = float('nan')
+                block['status'] = 'first'
+            else:
+                block['previous_rank'] = block['item'].map(previous)
+                dropped = previous[~previous.index.isin(ranks.index)]
+                block = pd.concat([block, pd.DataFrame({'year': year, 'item': dropped.index,
+                                                        'rank': float('nan'),
+                                                        'previous_rank': dropped.to_numpy()})],
+                                  ignore_index=True)
+                block['status'] = 'same'
+                block.loc[block['rank'] < block['previous_rank'], 'status'] = 'up'
+                block.loc[block['rank'] > block['previous_rank'], 'status'] = 'down'
+                block.loc[block['previous_rank'].isna(), 'status'] = 'new'
+                block.loc[block['rank'].isna(), 'status'] = 'dropped'
+            # positive when an item moved up
+            block['delta'] = block['previous_rank'] - block['rank']
+            blocks.append(block[COLUMNS])
+            self._orders[year] = ranks.to_dict()
+            self._fingerprints[year] = fingerprints[year]
+        self.table = pd.concat(blocks, ignore_index=True)
+        return self
+
+    def year(self, year):
+        """Rows of one year, most significant item first."""
+        if year not in self._orders:
+            raise KeyError(f'no ranking for {year}')
+        return self.table[self.table['year'] == year]
+
+    def _previous_year(self, year):
+        position = self.years.index(year)
+        return self.years[position - 1] if position else None
+
+    def labels(self, year):
+        """Short description of every ranked item's position and movement, for hover text."""
+        previous_year = self._previous_year(year)
+        labels = {}
+        for row in self.year(year).itertuples():
+            if row.status == 'dropped':
+                continue
+            label = f'Ranked {ordinal(row.rank)}'
+            if row.status == 'new':
+                label += f', new in {year}'
+            elif row.status == 'same':
+                label += f', unchanged since {previous_year}'
+            elif row.status != 'first':
+                label += f', {row.status} from {ordinal(row.previous_rank)} in {previous_year}'
+            labels[row.item] = label
+        return labels
+
+    def caption(self, year, limit=3):
+        """One or two sentences on the largest rank movements since the previous year."""
+        rows = self.year(year)
+        previous_year = self._previous_year(year)
+        if previous_year is None:
+            return f'Top ranked in {year}: {_join(rows["item"].head(3).tolist())}.'
+
+        moved = rows[rows['status'].isin(['up', 'down'])]
+        moved = moved.reindex(moved['delta'].abs().sort_values(ascending=False, kind='stable').index).head(limit)
+        sentences = []
+        if len(moved):
+            moves = [f'{row.item} moved {row.status} from {ordinal(row.previous_rank)} to {ordinal(row.rank)}'
+                     for row in moved.itertuples()]
+            sentences.append(f'Compared with {previous_year}, {_join(moves)}.')
+        else:
+            sentences.append(f'The ranking is unchanged from {previous_year}.')
+        for status, text in (('new', f'new in {year}'), ('dropped', f'not asked in {year}')):
+            items = rows.loc[rows['status'] == status, 'item'].tolist()
+            if items:
+                sentences.append(f'{_join(items)} {"was" if len(items) == 1 else "were"} {text}.')
+        return ' '.join(sentences)
+
+
+# Trends of the RANKED datasets, kept across reruns and extended when new years come in
+_trends = {}
+_lock = threading.Lock()
+
+
+def rank_trends(name, data):
+    """RankTrends of one of the RANKED datasets, only computing the years not seen before."""
+    column, descending = RANKED[name]
+    # dashboard sessions run in threads and share these tables
+    with _lock:
+        trends = _trends.get(name)
+        if trends is None or not trends.covers(data):
+            trends = _trends[name] = RankTrends(column, descending)
+        new_rows = data if not trends.years else data[data['year'] > trends.years[-1]]
+        return trends.append(new_rows)